@@ -1,28 +1,57 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, Query
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, Query, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, InsertOne, IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError, BulkWriteError, PyMongoError, OperationFailure
 import os
+import asyncio
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional, Literal
+from typing import List, Optional, Literal, Generic, TypeVar
 import uuid
+import re
+import hmac
+import time
 from datetime import datetime, timezone, timedelta
+from zoneinfo import ZoneInfo
 import jwt
+import orjson
+from cachetools import TTLCache
 import bcrypt
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
 import csv
-import io
-from fastapi.responses import StreamingResponse
+import zlib
+from fastapi.responses import StreamingResponse, ORJSONResponse, FileResponse
 from enum import Enum
+from collections import defaultdict
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection. Every worker process opens its own pool, so the server
+# holds up to workers x MONGO_MAX_POOL_SIZE connections (and workers x
+# MONGO_MIN_POOL_SIZE while idle). The defaults split a budget of 200/10
+# connections across WEB_CONCURRENCY workers (one per CPU by default).
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY') or os.cpu_count() or 1)
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE') or max(200 // WEB_CONCURRENCY, 10))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE') or max(10 // WEB_CONCURRENCY, 1))
+
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(
+    mongo_url,
+    maxPoolSize=MONGO_MAX_POOL_SIZE,
+    minPoolSize=MONGO_MIN_POOL_SIZE,
+    maxIdleTimeMS=300_000,
+    maxConnecting=4,
+    waitQueueTimeoutMS=5000,
+    serverSelectionTimeoutMS=5000,
+    compressors="zstd,zlib",
+    tz_aware=True
+)
 db = client[os.environ['DB_NAME']]
 
 # JWT Configuration
@@ -30,11 +59,65 @@ JWT_SECRET = os.environ.get('JWT_SECRET', 'helpline-crm-secret-key-2025')
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_HOURS = 24
 
+# Shared decoder with key and algorithms resolved once at import
+jwt_decoder = jwt.PyJWT()
+JWT_KEY = JWT_SECRET.encode('utf-8')
+JWT_ALGORITHMS = (JWT_ALGORITHM,)
+
+# Authenticated users keyed by raw token, so repeat requests skip the JWT
+# decode and user lookup. Admin changes to a user clear it, but only in the
+# worker that handled the change; every other worker keeps serving the old
+# role and status until the entry expires. The short TTL bounds how long a
+# deactivated, demoted or deleted user keeps access.
+USER_CACHE_TTL = 5  # seconds
+user_cache = TTLCache(maxsize=10_000, ttl=USER_CACHE_TTL)
+
+# Password hashing (argon2id; bcrypt hashes are still accepted and upgraded on login)
+password_hasher = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
+
+# Verified against when the email is unknown, so failed logins take the same time
+DUMMY_PASSWORD_HASH = password_hasher.hash(uuid.uuid4().hex)
+
 # FreePBX Webhook Secret (optional for security)
 FREEPBX_WEBHOOK_SECRET = os.environ.get('FREEPBX_WEBHOOK_SECRET', '')
+FREEPBX_WEBHOOK_SECRET_BYTES = FREEPBX_WEBHOOK_SECRET.encode('utf-8')
+
+# Time zone of webhook timestamps sent without an offset (PBX local time)
+FREEPBX_TIMEZONE = ZoneInfo(os.environ.get('FREEPBX_TIMEZONE', 'UTC'))
+
+# Timestamp layouts accepted from FreePBX besides ISO 8601 and Unix epochs
+FREEPBX_TIMESTAMP_FORMATS = (
+    "%Y/%m/%d %H:%M:%S",
+    "%Y/%m/%d %H:%M",
+    "%a %b %d %H:%M:%S %Y",
+    "%d/%m/%Y %H:%M:%S",
+)
+
+# Webhook call events are queued and written to MongoDB in batches of up to
+# CALL_EVENT_BATCH_SIZE, or whatever arrived within CALL_EVENT_FLUSH_INTERVAL.
+# Failed batches are retried with exponential backoff; when the queue is full
+# the webhook writes its event directly instead.
+CALL_EVENT_BATCH_SIZE = 100
+CALL_EVENT_FLUSH_INTERVAL = 0.05  # seconds
+CALL_EVENT_QUEUE_SIZE = 10_000
+CALL_EVENT_WRITE_RETRIES = 5
+call_event_queue: asyncio.Queue = asyncio.Queue(maxsize=CALL_EVENT_QUEUE_SIZE)
+
+# Translation table that strips everything but digits and '+' from ASCII phone
+# numbers; see normalize_phone_number for other input
+PHONE_NUMBER_TABLE = str.maketrans({
+    c: None for c in map(chr, range(128)) if not (c.isdigit() or c == '+')
+})
+
+def normalize_phone_number(phone_number: str) -> str:
+    """Keep only the digits and '+' of a phone number"""
+    if phone_number.isascii():
+        return phone_number.translate(PHONE_NUMBER_TABLE)
+    # The table leaves non-ASCII characters alone, so filter those per character
+    return ''.join(c for c in phone_number if c.isdigit() or c == '+')
 
 # Create the main app
-app = FastAPI(title="HelplineOS CRM API")
+app = FastAPI(title="HelplineOS CRM API", default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -62,6 +145,17 @@ class UserStatus(str, Enum):
 
 # ==================== MODELS ====================
 
+# Paginated list wrapper; `next` holds the query parameters for the following page
+T = TypeVar("T")
+
+class PageCursor(BaseModel):
+    after: datetime
+    after_id: str
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next: Optional[PageCursor] = None
+
 # User Models
 class UserCreate(BaseModel):
     email: EmailStr
@@ -79,8 +173,8 @@ class UserResponse(BaseModel):
     name: str
     role: str
     status: str = "active"
-    created_at: str
-    last_login: Optional[str] = None
+    created_at: datetime
+    last_login: Optional[datetime] = None
 
 class TokenResponse(BaseModel):
     access_token: str
@@ -110,8 +204,8 @@ class AdminUserListResponse(BaseModel):
     name: str
     role: str
     status: str
-    created_at: str
-    last_login: Optional[str] = None
+    created_at: datetime
+    last_login: Optional[datetime] = None
 
 # Contact Models
 class ContactCreate(BaseModel):
@@ -139,8 +233,8 @@ class ContactResponse(BaseModel):
     address: Optional[str] = None
     company: Optional[str] = None
     tags: List[str] = []
-    created_at: str
-    updated_at: str
+    created_at: datetime
+    updated_at: datetime
 
 # Call Models
 class CallCreate(BaseModel):
@@ -175,7 +269,7 @@ class CallResponse(BaseModel):
     priority: str
     status: str
     resolution_notes: Optional[str] = None
-    timestamp: str
+    timestamp: datetime
     freepbx_call_id: Optional[str] = None
 
 class CallStats(BaseModel):
@@ -195,7 +289,7 @@ class FreePBXCallEvent(BaseModel):
     extension: Optional[str] = None  # Agent's extension
     agent_username: Optional[str] = None  # Agent's username/email
     call_id: Optional[str] = None  # FreePBX unique call ID
-    timestamp: Optional[str] = None
+    timestamp: Optional[str] = None  # parsed leniently, see parse_freepbx_timestamp
     direction: Optional[str] = "inbound"  # inbound, outbound
 
 class FreePBXCallEventResponse(BaseModel):
@@ -218,16 +312,39 @@ class CallEventResponse(BaseModel):
     contact_exists: bool
     event_type: str
     redirect_url: str
-    timestamp: str
+    timestamp: datetime
     processed: bool = False
 
+# ==================== ID HELPERS ====================
+
+def generate_id() -> str:
+    """Generate a time-ordered UUIDv7 (48-bit Unix ms timestamp + random bits)"""
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), 'big')
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return str(uuid.UUID(int=value))
+
 # ==================== AUTH HELPERS ====================
 
+# Fields of the authenticated user that route handlers rely on
+CURRENT_USER_PROJECTION = {
+    "_id": 0, "id": 1, "role": 1, "name": 1, "email": 1,
+    "status": 1, "created_at": 1, "last_login": 1
+}
+
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return password_hasher.hash(password)
+
+def is_legacy_hash(hashed: str) -> bool:
+    return hashed.startswith('$2')
 
 def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    if is_legacy_hash(hashed):
+        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    try:
+        return password_hasher.verify(hashed, password)
+    except (VerificationError, InvalidHashError):
+        return False
 
 def create_token(user_id: str, role: str) -> str:
     payload = {
@@ -235,16 +352,21 @@ def create_token(user_id: str, role: str) -> str:
         'role': role,
         'exp': datetime.now(timezone.utc) + timedelta(hours=JWT_EXPIRATION_HOURS)
     }
-    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    return jwt.encode(payload, JWT_KEY, algorithm=JWT_ALGORITHM)
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    token = credentials.credentials
+    cached = user_cache.get(token)
+    if cached and cached[1] > time.time():
+        return cached[0]
+    
     try:
-        payload = jwt.decode(credentials.credentials, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        payload = jwt_decoder.decode(token, JWT_KEY, algorithms=JWT_ALGORITHMS)
         user_id = payload.get('user_id')
         if not user_id:
             raise HTTPException(status_code=401, detail="Invalid token")
         
-        user = await db.users.find_one({"id": user_id}, {"_id": 0})
+        user = await db.users.find_one({"id": user_id}, CURRENT_USER_PROJECTION)
         if not user:
             raise HTTPException(status_code=401, detail="User not found")
         
@@ -252,6 +374,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         if user.get('status', 'active') == 'inactive':
             raise HTTPException(status_code=403, detail="Account is deactivated")
         
+        user_cache[token] = (user, payload['exp'])
         return user
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
@@ -263,10 +386,10 @@ async def get_optional_user(credentials: HTTPAuthorizationCredentials = Depends(
     if not credentials:
         return None
     try:
-        payload = jwt.decode(credentials.credentials, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        payload = jwt_decoder.decode(credentials.credentials, JWT_KEY, algorithms=JWT_ALGORITHMS)
         user_id = payload.get('user_id')
         if user_id:
-            user = await db.users.find_one({"id": user_id}, {"_id": 0})
+            user = await db.users.find_one({"id": user_id}, CURRENT_USER_PROJECTION)
             return user
     except:
         pass
@@ -289,6 +412,109 @@ require_admin = require_role(["admin"])
 require_supervisor_or_admin = require_role(["admin", "supervisor"])
 require_any_role = require_role(["admin", "supervisor", "agent"])
 
+# ==================== RESPONSE HELPERS ====================
+
+def stream_json_page(
+    cursor,
+    limit: int,
+    cursor_field: str,
+    defaults: Optional[dict] = None
+) -> StreamingResponse:
+    """
+    Stream documents from a Motor cursor as a Page, one document at a time.
+    
+    When the page is full, `next` is set to the last document's `cursor_field`
+    and id, to be passed back as `after` and `after_id`.
+    """
+    async def generate():
+        separator = b'{"items":['
+        count = 0
+        last_doc = None
+        async for doc in cursor:
+            if defaults:
+                for key, value in defaults.items():
+                    doc.setdefault(key, value)
+            yield separator + orjson.dumps(doc)
+            separator = b","
+            count += 1
+            last_doc = doc
+        next_cursor = None
+        if last_doc and count >= limit:
+            next_cursor = {"after": last_doc.get(cursor_field), "after_id": last_doc.get("id")}
+        if not count:
+            yield separator
+        yield b'],"next":' + orjson.dumps(next_cursor) + b"}"
+    
+    return StreamingResponse(generate(), media_type="application/json")
+
+def text_search_filter(search: str, *prefix_fields: str) -> dict:
+    """
+    Match `search` as a phrase against the collection's text index, or as an
+    anchored prefix of any of `prefix_fields`.
+    
+    A plain $text search ORs its tokens together, and MongoDB splits on '@',
+    '.' and whitespace, so "alice@company.com" would match anything with
+    "company" or "com". Every prefix field needs its own index for MongoDB to
+    accept the $text inside an $or.
+    """
+    prefix = {"$regex": f"^{re.escape(search)}"}
+    clauses = [{field: prefix} for field in prefix_fields]
+    phrase = search.replace('"', ' ').strip()
+    if phrase:
+        clauses.insert(0, {"$text": {"$search": f'"{phrase}"'}})
+    return {"$or": clauses}
+
+def add_keyset_filter(
+    query: dict,
+    cursor_field: str,
+    after: Optional[datetime],
+    after_id: Optional[str]
+):
+    """
+    Restrict `query` to documents that sort after (`after`, `after_id`) in a
+    descending (`cursor_field`, id) order.
+    
+    Timestamps only keep milliseconds, so the id breaks ties between documents
+    created in the same millisecond at a page boundary.
+    """
+    if not after:
+        return
+    if after_id:
+        condition = {"$or": [
+            {cursor_field: {"$lt": after}},
+            {cursor_field: after, "id": {"$lt": after_id}}
+        ]}
+    else:
+        condition = {cursor_field: {"$lt": after}}
+    query.setdefault("$and", []).append(condition)
+
+def parse_prefer_header(prefer: str) -> set:
+    """
+    Return the preferences in a Prefer header (RFC 7240) as normalized
+    "name=value" strings, e.g. {"return=minimal", "handling=lenient"}.
+    Parameters after ';' are dropped.
+    """
+    preferences = set()
+    for preference in prefer.split(","):
+        name, _, value = preference.split(";")[0].partition("=")
+        name = name.strip().lower()
+        value = value.strip().strip('"').lower()
+        if name:
+            preferences.add(f"{name}={value}" if value else name)
+    return preferences
+
+def gzip_stream(chunks):
+    """Gzip an async stream of byte chunks on the fly"""
+    async def generate():
+        compressor = zlib.compressobj(wbits=31)  # 31 selects the gzip container
+        async for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+    
+    return generate()
+
 # ==================== AUTH ROUTES ====================
 
 @api_router.post("/auth/register", response_model=TokenResponse)
@@ -303,13 +529,16 @@ async def register(user_data: UserCreate):
     role = "admin" if user_count == 0 else "agent"
     
     # Create user
-    user_id = str(uuid.uuid4())
-    now = datetime.now(timezone.utc).isoformat()
+    user_id = generate_id()
+    now = datetime.now(timezone.utc)
+    password_hash = await asyncio.get_running_loop().run_in_executor(
+        None, hash_password, user_data.password
+    )
     
     user_doc = {
         "id": user_id,
         "email": user_data.email,
-        "password_hash": hash_password(user_data.password),
+        "password_hash": password_hash,
         "name": user_data.name,
         "role": role,
         "status": "active",
@@ -317,7 +546,10 @@ async def register(user_data: UserCreate):
         "last_login": now
     }
     
-    await db.users.insert_one(user_doc)
+    try:
+        await db.users.insert_one(user_doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
     
     token = create_token(user_id, role)
     
@@ -338,7 +570,14 @@ async def register(user_data: UserCreate):
 async def login(credentials: UserLogin):
     user = await db.users.find_one({"email": credentials.email}, {"_id": 0})
     
-    if not user or not verify_password(credentials.password, user['password_hash']):
+    # Password hashing is CPU-bound, run it off the event loop. Always verify
+    # (against a dummy hash for unknown emails) so timing doesn't reveal accounts.
+    loop = asyncio.get_running_loop()
+    password_hash = user['password_hash'] if user else DUMMY_PASSWORD_HASH
+    password_ok = await loop.run_in_executor(
+        None, verify_password, credentials.password, password_hash
+    )
+    if not user or not password_ok:
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
     # Check if user is active
@@ -346,8 +585,16 @@ async def login(credentials: UserLogin):
         raise HTTPException(status_code=403, detail="Account is deactivated. Contact administrator.")
     
     # Update last login
-    now = datetime.now(timezone.utc).isoformat()
-    await db.users.update_one({"id": user['id']}, {"$set": {"last_login": now}})
+    now = datetime.now(timezone.utc)
+    update_data = {"last_login": now}
+    
+    # Upgrade legacy bcrypt hashes now that we have the plaintext
+    if is_legacy_hash(user['password_hash']):
+        update_data["password_hash"] = await loop.run_in_executor(
+            None, hash_password, credentials.password
+        )
+    
+    await db.users.update_one({"id": user['id']}, {"$set": update_data})
     
     token = create_token(user['id'], user['role'])
     
@@ -378,21 +625,21 @@ async def get_me(current_user: dict = Depends(get_current_user)):
 
 # ==================== ADMIN USER MANAGEMENT ROUTES ====================
 
-@api_router.get("/admin/users", response_model=List[AdminUserListResponse])
+@api_router.get("/admin/users", response_model=Page[AdminUserListResponse])
 async def admin_list_users(
     search: Optional[str] = None,
     role: Optional[str] = None,
     status: Optional[str] = None,
+    after: Optional[datetime] = Query(None),
+    after_id: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
     current_user: dict = Depends(require_admin)
 ):
     """List all users (admin only)"""
     query = {}
     
     if search:
-        query["$or"] = [
-            {"name": {"$regex": search, "$options": "i"}},
-            {"email": {"$regex": search, "$options": "i"}}
-        ]
+        query.update(text_search_filter(search, "email"))
     
     if role:
         query["role"] = role
@@ -400,14 +647,16 @@ async def admin_list_users(
     if status:
         query["status"] = status
     
-    users = await db.users.find(query, {"_id": 0, "password_hash": 0}).sort("created_at", -1).to_list(1000)
+    add_keyset_filter(query, "created_at", after, after_id)
     
-    # Ensure all users have status field
-    for user in users:
-        if 'status' not in user:
-            user['status'] = 'active'
+    users = (
+        db.users.find(query, {"_id": 0, "password_hash": 0})
+        .sort([("created_at", -1), ("id", -1)])
+        .limit(limit)
+    )
     
-    return users
+    # Ensure all users have status field
+    return stream_json_page(users, limit, "created_at", defaults={"status": "active"})
 
 @api_router.post("/admin/users", response_model=AdminUserListResponse)
 async def admin_create_user(
@@ -420,13 +669,16 @@ async def admin_create_user(
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    user_id = str(uuid.uuid4())
-    now = datetime.now(timezone.utc).isoformat()
+    user_id = generate_id()
+    now = datetime.now(timezone.utc)
+    password_hash = await asyncio.get_running_loop().run_in_executor(
+        None, hash_password, user_data.password
+    )
     
     user_doc = {
         "id": user_id,
         "email": user_data.email,
-        "password_hash": hash_password(user_data.password),
+        "password_hash": password_hash,
         "name": user_data.name,
         "role": user_data.role,
         "status": "active",
@@ -434,7 +686,10 @@ async def admin_create_user(
         "last_login": None
     }
     
-    await db.users.insert_one(user_doc)
+    try:
+        await db.users.insert_one(user_doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
     
     logger.info(f"Admin {current_user['email']} created user {user_data.email} with role {user_data.role}")
     
@@ -461,7 +716,9 @@ async def admin_get_user(
     if 'status' not in user:
         user['status'] = 'active'
     
-    return user
+    # Documents read back from MongoDB already match the response model, so
+    # return them as-is rather than re-validating every field
+    return ORJSONResponse(user)
 
 @api_router.put("/admin/users/{user_id}", response_model=AdminUserListResponse)
 async def admin_update_user(
@@ -470,10 +727,6 @@ async def admin_update_user(
     current_user: dict = Depends(require_admin)
 ):
     """Update a user (admin only)"""
-    user = await db.users.find_one({"id": user_id})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
     # Prevent admin from demoting themselves
     if user_id == current_user['id'] and user_data.role and user_data.role != "admin":
         raise HTTPException(status_code=400, detail="Cannot change your own role")
@@ -484,17 +737,31 @@ async def admin_update_user(
     
     update_data = {k: v for k, v in user_data.model_dump().items() if v is not None}
     
+    projection = {"_id": 0, "password_hash": 0}
     if update_data:
-        await db.users.update_one({"id": user_id}, {"$set": update_data})
+        try:
+            updated = await db.users.find_one_and_update(
+                {"id": user_id},
+                {"$set": update_data},
+                projection=projection,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            raise HTTPException(status_code=400, detail="Email already registered")
+    else:
+        updated = await db.users.find_one({"id": user_id}, projection)
     
-    updated = await db.users.find_one({"id": user_id}, {"_id": 0, "password_hash": 0})
+    if not updated:
+        raise HTTPException(status_code=404, detail="User not found")
     
     if 'status' not in updated:
         updated['status'] = 'active'
     
+    user_cache.clear()
+    
     logger.info(f"Admin {current_user['email']} updated user {user_id}: {update_data}")
     
-    return updated
+    return ORJSONResponse(updated)
 
 @api_router.post("/admin/users/{user_id}/reset-password")
 async def admin_reset_password(
@@ -510,8 +777,11 @@ async def admin_reset_password(
     if len(password_data.new_password) < 6:
         raise HTTPException(status_code=400, detail="Password must be at least 6 characters")
     
-    new_hash = hash_password(password_data.new_password)
+    new_hash = await asyncio.get_running_loop().run_in_executor(
+        None, hash_password, password_data.new_password
+    )
     await db.users.update_one({"id": user_id}, {"$set": {"password_hash": new_hash}})
+    user_cache.clear()
     
     logger.info(f"Admin {current_user['email']} reset password for user {user_id}")
     
@@ -531,6 +801,7 @@ async def admin_delete_user(
         raise HTTPException(status_code=404, detail="User not found")
     
     await db.users.delete_one({"id": user_id})
+    user_cache.clear()
     
     logger.info(f"Admin {current_user['email']} deleted user {user_id}")
     
@@ -539,22 +810,38 @@ async def admin_delete_user(
 @api_router.get("/admin/stats")
 async def admin_get_stats(current_user: dict = Depends(require_admin)):
     """Get admin dashboard statistics"""
-    # User stats
-    total_users = await db.users.count_documents({})
-    active_users = await db.users.count_documents({"status": {"$ne": "inactive"}})
+    week_ago = datetime.now(timezone.utc) - timedelta(days=7)
+    
+    # Users (total, active, by role), contacts and calls (total, last 7 days)
+    # are independent, so query all three collections concurrently
+    users_result, total_contacts, calls_result = await asyncio.gather(
+        db.users.aggregate([
+            {"$facet": {
+                "total": [{"$count": "n"}],
+                "active": [{"$match": {"status": {"$ne": "inactive"}}}, {"$count": "n"}],
+                "by_role": [{"$group": {"_id": "$role", "n": {"$sum": 1}}}]
+            }}
+        ]).to_list(1),
+        db.contacts.count_documents({}),
+        db.calls.aggregate([
+            {"$facet": {
+                "total": [{"$count": "n"}],
+                "recent": [{"$match": {"timestamp": {"$gte": week_ago}}}, {"$count": "n"}]
+            }}
+        ]).to_list(1)
+    )
     
-    # User by role
-    users_by_role = {}
-    for role in ["admin", "supervisor", "agent"]:
-        users_by_role[role] = await db.users.count_documents({"role": role})
+    users_facets = users_result[0]
+    total_users = users_facets["total"][0]["n"] if users_facets["total"] else 0
+    active_users = users_facets["active"][0]["n"] if users_facets["active"] else 0
     
-    # Contact and call stats
-    total_contacts = await db.contacts.count_documents({})
-    total_calls = await db.calls.count_documents({})
+    # User by role
+    role_counts = {doc["_id"]: doc["n"] for doc in users_facets["by_role"]}
+    users_by_role = {role: role_counts.get(role, 0) for role in ["admin", "supervisor", "agent"]}
     
-    # Recent activity (last 7 days)
-    week_ago = (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
-    recent_calls = await db.calls.count_documents({"timestamp": {"$gte": week_ago}})
+    calls_facets = calls_result[0]
+    total_calls = calls_facets["total"][0]["n"] if calls_facets["total"] else 0
+    recent_calls = calls_facets["recent"][0]["n"] if calls_facets["recent"] else 0
     
     return {
         "users": {
@@ -573,6 +860,30 @@ async def admin_get_stats(current_user: dict = Depends(require_admin)):
 
 # ==================== FREEPBX WEBHOOK ROUTES ====================
 
+def parse_freepbx_timestamp(value: str) -> Optional[datetime]:
+    """
+    Parse a webhook timestamp as ISO 8601, a Unix epoch or one of
+    FREEPBX_TIMESTAMP_FORMATS. Values without an offset are taken as
+    FREEPBX_TIMEZONE local time. Returns None if nothing matches.
+    """
+    value = value.strip()
+    try:
+        return datetime.fromtimestamp(float(value), timezone.utc)
+    except (ValueError, OverflowError, OSError):
+        pass
+    
+    parsers = [datetime.fromisoformat]
+    parsers += [lambda v, fmt=fmt: datetime.strptime(v, fmt) for fmt in FREEPBX_TIMESTAMP_FORMATS]
+    for parse in parsers:
+        try:
+            parsed = parse(value)
+        except ValueError:
+            continue
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=FREEPBX_TIMEZONE)
+        return parsed
+    return None
+
 @api_router.post("/freepbx/call-event", response_model=FreePBXCallEventResponse)
 async def handle_freepbx_call_event(
     event: FreePBXCallEvent,
@@ -590,36 +901,50 @@ async def handle_freepbx_call_event(
        - If no contact: /contacts/new?phone={callerNumber}&callEventId={eventId}
     """
     # Verify webhook secret if configured
-    if FREEPBX_WEBHOOK_SECRET and webhook_secret != FREEPBX_WEBHOOK_SECRET:
+    if FREEPBX_WEBHOOK_SECRET and not hmac.compare_digest(
+        (webhook_secret or '').encode('utf-8'), FREEPBX_WEBHOOK_SECRET_BYTES
+    ):
         raise HTTPException(status_code=401, detail="Invalid webhook secret")
     
     logger.info(f"FreePBX call event received: {event.event_type} from {event.caller_id}")
     
     # Normalize phone number (remove spaces, dashes, etc.)
-    caller_number = ''.join(filter(lambda x: x.isdigit() or x == '+', event.caller_id))
-    
-    # Look up contact by phone number
-    contact = await db.contacts.find_one({"phone_number": caller_number}, {"_id": 0})
-    
-    # Also try with original caller_id format
-    if not contact:
-        contact = await db.contacts.find_one({"phone_number": event.caller_id}, {"_id": 0})
+    caller_number = normalize_phone_number(event.caller_id)
+    
+    # Look up contact by normalized or original caller_id format in a single
+    # query, and agent by username and by extension (stored in user profile or
+    # separate mapping). Extensions aren't unique, so the two agent lookups
+    # stay separate to keep the username match. All run concurrently.
+    async def find_agent(field: str, value: Optional[str]):
+        if not value:
+            return None
+        return await db.users.find_one({field: value}, {"_id": 0, "password_hash": 0})
+    
+    contacts, agent_by_username, agent_by_extension = await asyncio.gather(
+        db.contacts.find(
+            {"phone_number": {"$in": [caller_number, event.caller_id]}}, {"_id": 0}
+        ).to_list(2),
+        find_agent("email", event.agent_username),
+        find_agent("extension", event.extension)
+    )
     
+    # Prefer the normalized number, then the username, when both match
+    contact = next((c for c in contacts if c['phone_number'] == caller_number), None)
+    contact = contact or next(iter(contacts), None)
     contact_exists = contact is not None
     contact_id = contact['id'] if contact else None
     
-    # Find agent by extension or username
-    agent = None
-    if event.agent_username:
-        agent = await db.users.find_one({"email": event.agent_username}, {"_id": 0, "password_hash": 0})
-    
-    if not agent and event.extension:
-        # Try to find agent by extension (stored in user profile or separate mapping)
-        agent = await db.users.find_one({"extension": event.extension}, {"_id": 0, "password_hash": 0})
+    agent = agent_by_username or agent_by_extension
     
     # Create call event record
-    event_id = str(uuid.uuid4())
-    now = datetime.now(timezone.utc).isoformat()
+    event_id = generate_id()
+    now = datetime.now(timezone.utc)
+    
+    # An unparseable timestamp shouldn't lose the event: record when it
+    # arrived and keep what FreePBX sent
+    timestamp = parse_freepbx_timestamp(event.timestamp) if event.timestamp else None
+    if event.timestamp and not timestamp:
+        logger.warning(f"Unrecognized FreePBX timestamp {event.timestamp!r}, using receive time")
     
     # Determine redirect URL
     if contact_exists:
@@ -640,14 +965,20 @@ async def handle_freepbx_call_event(
         "event_type": event.event_type,
         "direction": event.direction or "inbound",
         "redirect_url": redirect_url,
-        "timestamp": event.timestamp or now,
+        "timestamp": timestamp or now,
+        "raw_timestamp": event.timestamp if event.timestamp and not timestamp else None,
         "created_at": now,
         "processed": False
     }
     
-    await db.call_events.insert_one(call_event_doc)
+    # Persisted by the background writer so the response doesn't wait on
+    # MongoDB, unless the writer has fallen behind and the queue is full
+    try:
+        call_event_queue.put_nowait(call_event_doc)
+    except asyncio.QueueFull:
+        await db.call_events.insert_one(call_event_doc)
     
-    logger.info(f"Call event {event_id} created. Redirect: {redirect_url}")
+    logger.info(f"Call event {event_id} queued. Redirect: {redirect_url}")
     
     return FreePBXCallEventResponse(
         success=True,
@@ -658,11 +989,13 @@ async def handle_freepbx_call_event(
         message=message
     )
 
-@api_router.get("/freepbx/call-events")
+@api_router.get("/freepbx/call-events", response_model=Page[CallEventResponse])
 async def get_call_events(
     agent_id: Optional[str] = None,
     processed: Optional[bool] = None,
-    limit: int = 50,
+    after: Optional[datetime] = Query(None),
+    after_id: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
     current_user: dict = Depends(get_current_user)
 ):
     """Get recent call events for an agent"""
@@ -677,8 +1010,10 @@ async def get_call_events(
     if processed is not None:
         query["processed"] = processed
     
-    events = await db.call_events.find(query, {"_id": 0}).sort("created_at", -1).to_list(limit)
-    return events
+    add_keyset_filter(query, "created_at", after, after_id)
+    
+    events = db.call_events.find(query, {"_id": 0}).sort([("created_at", -1), ("id", -1)]).limit(limit)
+    return stream_json_page(events, limit, "created_at")
 
 @api_router.get("/freepbx/call-events/{event_id}")
 async def get_call_event(
@@ -689,7 +1024,7 @@ async def get_call_event(
     event = await db.call_events.find_one({"id": event_id}, {"_id": 0})
     if not event:
         raise HTTPException(status_code=404, detail="Call event not found")
-    return event
+    return ORJSONResponse(event)
 
 @api_router.put("/freepbx/call-events/{event_id}/mark-processed")
 async def mark_call_event_processed(
@@ -697,14 +1032,12 @@ async def mark_call_event_processed(
     current_user: dict = Depends(get_current_user)
 ):
     """Mark a call event as processed (after agent handles it)"""
-    event = await db.call_events.find_one({"id": event_id})
-    if not event:
-        raise HTTPException(status_code=404, detail="Call event not found")
-    
-    await db.call_events.update_one(
+    result = await db.call_events.update_one(
         {"id": event_id}, 
-        {"$set": {"processed": True, "processed_at": datetime.now(timezone.utc).isoformat()}}
+        {"$set": {"processed": True, "processed_at": datetime.now(timezone.utc)}}
     )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Call event not found")
     
     return {"message": "Call event marked as processed"}
 
@@ -720,31 +1053,87 @@ async def get_pending_calls(current_user: dict = Depends(get_current_user)):
         query["agent_id"] = current_user['id']
     
     events = await db.call_events.find(query, {"_id": 0}).sort("created_at", -1).to_list(10)
-    return events
+    return ORJSONResponse(events)
+
+async def insert_call_events(docs: List[dict]):
+    """
+    Insert a batch of call events with a single bulk_write, retrying
+    transient failures with exponential backoff.
+    
+    Retries resend the whole batch; events already written by an earlier
+    attempt fail with a duplicate key error, which is ignored.
+    """
+    for attempt in range(CALL_EVENT_WRITE_RETRIES):
+        try:
+            await db.call_events.bulk_write([InsertOne(doc) for doc in docs], ordered=False)
+            return
+        except BulkWriteError as e:
+            # Write errors other than duplicates won't succeed on a retry
+            errors = [err for err in e.details["writeErrors"] if err["code"] != 11000]
+            if errors:
+                logger.error(f"Failed to write {len(errors)} of {len(docs)} call events: {errors}")
+            if not e.details.get("writeConcernErrors"):
+                return
+            logger.warning(f"Write concern error writing call events (attempt {attempt + 1})")
+        except PyMongoError:
+            logger.warning(f"Failed to write {len(docs)} call events (attempt {attempt + 1})", exc_info=True)
+        await asyncio.sleep(0.1 * 2 ** attempt)
+    
+    logger.error(
+        f"Giving up on {len(docs)} call events after {CALL_EVENT_WRITE_RETRIES} attempts: "
+        f"{[doc['id'] for doc in docs]}"
+    )
+
+async def write_call_events():
+    """Drain the call event queue, inserting it in batches"""
+    loop = asyncio.get_running_loop()
+    stopping = False
+    
+    while not stopping:
+        doc = await call_event_queue.get()
+        if doc is None:
+            break
+        
+        docs = [doc]
+        deadline = loop.time() + CALL_EVENT_FLUSH_INTERVAL
+        while len(docs) < CALL_EVENT_BATCH_SIZE:
+            try:
+                doc = await asyncio.wait_for(call_event_queue.get(), deadline - loop.time())
+            except asyncio.TimeoutError:
+                break
+            if doc is None:
+                # Shutdown requested: write what we have, then stop
+                stopping = True
+                break
+            docs.append(doc)
+        
+        await insert_call_events(docs)
 
 # ==================== CONTACT ROUTES ====================
 
-@api_router.get("/contacts", response_model=List[ContactResponse])
+@api_router.get("/contacts", response_model=Page[ContactResponse])
 async def get_contacts(
     search: Optional[str] = None,
     tag: Optional[str] = None,
+    after: Optional[datetime] = Query(None),
+    after_id: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
     current_user: dict = Depends(get_current_user)
 ):
     query = {}
     
     if search:
-        query["$or"] = [
-            {"name": {"$regex": search, "$options": "i"}},
-            {"phone_number": {"$regex": search, "$options": "i"}},
-            {"email": {"$regex": search, "$options": "i"}},
-            {"company": {"$regex": search, "$options": "i"}}
-        ]
+        # Text index covers name/email/phone/company; anchored prefix matches
+        # keep partial phone number and email lookups working via their indexes
+        query.update(text_search_filter(search, "phone_number", "email"))
     
     if tag:
         query["tags"] = tag
     
-    contacts = await db.contacts.find(query, {"_id": 0}).sort("created_at", -1).to_list(1000)
-    return contacts
+    add_keyset_filter(query, "created_at", after, after_id)
+    
+    contacts = db.contacts.find(query, {"_id": 0}).sort([("created_at", -1), ("id", -1)]).limit(limit)
+    return stream_json_page(contacts, limit, "created_at")
 
 @api_router.post("/contacts", response_model=ContactResponse)
 async def create_contact(
@@ -756,8 +1145,8 @@ async def create_contact(
     if existing:
         raise HTTPException(status_code=400, detail="Contact with this phone number already exists")
     
-    contact_id = str(uuid.uuid4())
-    now = datetime.now(timezone.utc).isoformat()
+    contact_id = generate_id()
+    now = datetime.now(timezone.utc)
     
     contact_doc = {
         "id": contact_id,
@@ -771,9 +1160,17 @@ async def create_contact(
         "updated_at": now
     }
     
-    await db.contacts.insert_one(contact_doc)
+    try:
+        await db.contacts.insert_one(contact_doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Contact with this phone number already exists")
     return contact_doc
 
+@api_router.get("/contacts/count")
+async def get_contact_count(current_user: dict = Depends(get_current_user)):
+    """Get the total number of contacts"""
+    return {"count": await db.contacts.count_documents({})}
+
 @api_router.get("/contacts/by-phone/{phone_number}")
 async def get_contact_by_phone(
     phone_number: str,
@@ -781,8 +1178,8 @@ async def get_contact_by_phone(
 ):
     contact = await db.contacts.find_one({"phone_number": phone_number}, {"_id": 0})
     if not contact:
-        return {"found": False, "contact": None}
-    return {"found": True, "contact": contact}
+        return ORJSONResponse({"found": False, "contact": None})
+    return ORJSONResponse({"found": True, "contact": contact})
 
 @api_router.get("/contacts/{contact_id}", response_model=ContactResponse)
 async def get_contact(
@@ -792,7 +1189,7 @@ async def get_contact(
     contact = await db.contacts.find_one({"id": contact_id}, {"_id": 0})
     if not contact:
         raise HTTPException(status_code=404, detail="Contact not found")
-    return contact
+    return ORJSONResponse(contact)
 
 @api_router.put("/contacts/{contact_id}", response_model=ContactResponse)
 async def update_contact(
@@ -800,17 +1197,21 @@ async def update_contact(
     contact_data: ContactUpdate,
     current_user: dict = Depends(get_current_user)
 ):
-    contact = await db.contacts.find_one({"id": contact_id})
-    if not contact:
-        raise HTTPException(status_code=404, detail="Contact not found")
-    
     update_data = {k: v for k, v in contact_data.model_dump().items() if v is not None}
-    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
-    
-    await db.contacts.update_one({"id": contact_id}, {"$set": update_data})
+    update_data["updated_at"] = datetime.now(timezone.utc)
     
-    updated = await db.contacts.find_one({"id": contact_id}, {"_id": 0})
-    return updated
+    try:
+        updated = await db.contacts.find_one_and_update(
+            {"id": contact_id},
+            {"$set": update_data},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Contact with this phone number already exists")
+    if not updated:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    return ORJSONResponse(updated)
 
 @api_router.delete("/contacts/{contact_id}")
 async def delete_contact(
@@ -824,24 +1225,23 @@ async def delete_contact(
 
 # ==================== CALL ROUTES ====================
 
-@api_router.get("/calls", response_model=List[CallResponse])
+@api_router.get("/calls", response_model=Page[CallResponse])
 async def get_calls(
     search: Optional[str] = None,
     call_type: Optional[str] = None,
     priority: Optional[str] = None,
     status: Optional[str] = None,
-    date_from: Optional[str] = None,
-    date_to: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    after: Optional[datetime] = Query(None),
+    after_id: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
     current_user: dict = Depends(get_current_user)
 ):
     query = {}
     
     if search:
-        query["$or"] = [
-            {"caller_number": {"$regex": search, "$options": "i"}},
-            {"contact_name": {"$regex": search, "$options": "i"}},
-            {"notes": {"$regex": search, "$options": "i"}}
-        ]
+        query.update(text_search_filter(search, "caller_number"))
     
     if call_type:
         query["call_type"] = call_type
@@ -857,8 +1257,11 @@ async def get_calls(
         query["timestamp"] = query.get("timestamp", {})
         query["timestamp"]["$lte"] = date_to
     
-    calls = await db.calls.find(query, {"_id": 0}).sort("timestamp", -1).to_list(1000)
-    return calls
+    # Calls are keyed on their timestamp rather than created_at
+    add_keyset_filter(query, "timestamp", after, after_id)
+    
+    calls = db.calls.find(query, {"_id": 0}).sort([("timestamp", -1), ("id", -1)]).limit(limit)
+    return stream_json_page(calls, limit, "timestamp")
 
 @api_router.post("/calls", response_model=CallResponse)
 async def create_call(
@@ -877,8 +1280,8 @@ async def create_call(
     
     if not contact:
         # Auto-create contact
-        contact_id = str(uuid.uuid4())
-        now = datetime.now(timezone.utc).isoformat()
+        contact_id = generate_id()
+        now = datetime.now(timezone.utc)
         
         contact = {
             "id": contact_id,
@@ -892,12 +1295,16 @@ async def create_call(
             "updated_at": now
         }
         
-        await db.contacts.insert_one(contact)
-        logger.info(f"Auto-created contact for phone: {call_data.caller_number}")
+        try:
+            await db.contacts.insert_one(contact)
+            logger.info(f"Auto-created contact for phone: {call_data.caller_number}")
+        except DuplicateKeyError:
+            # A concurrent request created the contact first, so use that one
+            contact = await db.contacts.find_one({"phone_number": call_data.caller_number}, {"_id": 0})
     
     # Create call record
-    call_id = str(uuid.uuid4())
-    now = datetime.now(timezone.utc).isoformat()
+    call_id = generate_id()
+    now = datetime.now(timezone.utc)
     
     call_doc = {
         "id": call_id,
@@ -917,70 +1324,105 @@ async def create_call(
     }
     
     # Link to FreePBX call event if provided
+    call_event = None
     if call_event_id:
-        call_event = await db.call_events.find_one({"id": call_event_id})
-        if call_event:
-            call_doc["freepbx_call_id"] = call_event.get("freepbx_call_id")
-            # Mark event as processed
-            await db.call_events.update_one(
+        call_event = await db.call_events.find_one(
+            {"id": call_event_id}, {"_id": 0, "freepbx_call_id": 1}
+        )
+    
+    if call_event:
+        call_doc["freepbx_call_id"] = call_event.get("freepbx_call_id")
+        # Insert the call and mark the event as processed concurrently
+        await asyncio.gather(
+            db.calls.insert_one(call_doc),
+            db.call_events.update_one(
                 {"id": call_event_id},
                 {"$set": {"processed": True, "processed_at": now, "call_id": call_id}}
             )
+        )
+    else:
+        await db.calls.insert_one(call_doc)
     
-    await db.calls.insert_one(call_doc)
+    call_stats_cache.clear()
     return call_doc
 
+# Call stats are the same for every viewer, so cache them briefly keyed by
+# `since`. The lock makes concurrent misses compute the stats only once.
+call_stats_cache = TTLCache(maxsize=8, ttl=5)
+call_stats_lock = asyncio.Lock()
+
 @api_router.get("/calls/stats", response_model=CallStats)
-async def get_call_stats(current_user: dict = Depends(get_current_user)):
+async def get_call_stats(
+    since: Optional[datetime] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get call statistics.
+    
+    If `since` is given, the type/priority/status breakdowns and the average
+    duration only cover calls from that time on. Totals are always global.
+    """
+    stats = call_stats_cache.get(since)
+    if stats:
+        return stats
+    
+    async with call_stats_lock:
+        # Another request may have filled the cache while we waited
+        stats = call_stats_cache.get(since)
+        if not stats:
+            stats = await compute_call_stats(since)
+            call_stats_cache[since] = stats
+    return stats
+
+async def compute_call_stats(since: Optional[datetime]) -> CallStats:
     now = datetime.now(timezone.utc)
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
-    week_start = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
-    
-    # Total calls
-    total_calls = await db.calls.count_documents({})
-    
-    # Calls today
-    calls_today = await db.calls.count_documents({"timestamp": {"$gte": today_start}})
-    
-    # Calls this week
-    calls_this_week = await db.calls.count_documents({"timestamp": {"$gte": week_start}})
-    
-    # Calls by type
-    pipeline_type = [
-        {"$group": {"_id": "$call_type", "count": {"$sum": 1}}}
-    ]
-    calls_by_type_cursor = db.calls.aggregate(pipeline_type)
-    calls_by_type = {doc['_id']: doc['count'] async for doc in calls_by_type_cursor}
-    
-    # Calls by priority
-    pipeline_priority = [
-        {"$group": {"_id": "$priority", "count": {"$sum": 1}}}
-    ]
-    calls_by_priority_cursor = db.calls.aggregate(pipeline_priority)
-    calls_by_priority = {doc['_id']: doc['count'] async for doc in calls_by_priority_cursor}
-    
-    # Calls by status
-    pipeline_status = [
-        {"$group": {"_id": "$status", "count": {"$sum": 1}}}
-    ]
-    calls_by_status_cursor = db.calls.aggregate(pipeline_status)
-    calls_by_status = {doc['_id']: doc['count'] async for doc in calls_by_status_cursor}
-    
-    # Average duration
-    pipeline_avg = [
-        {"$group": {"_id": None, "avg_duration": {"$avg": "$duration"}}}
-    ]
-    avg_cursor = db.calls.aggregate(pipeline_avg)
-    avg_result = await avg_cursor.to_list(1)
-    avg_duration = avg_result[0]['avg_duration'] if avg_result and avg_result[0]['avg_duration'] else 0
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    week_start = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    # Type/priority/status breakdowns and average duration from a single $group
+    # pass keyed on all three fields. $group can't use an index itself, but a
+    # leading $match on the timestamp index limits the documents it has to touch.
+    pipeline = []
+    if since:
+        pipeline.append({"$match": {"timestamp": {"$gte": since}}})
+    pipeline.append({"$group": {
+        "_id": {"t": "$call_type", "p": "$priority", "s": "$status"},
+        "count": {"$sum": 1},
+        "duration_total": {"$sum": "$duration"},
+        "duration_count": {"$sum": {"$cond": [{"$isNumber": "$duration"}, 1, 0]}}
+    }})
+    
+    # The queries are independent, so run them concurrently. The unfiltered
+    # total comes from collection metadata instead of a scan, and today/week
+    # are range counts on the timestamp index.
+    total_calls, calls_today, calls_this_week, groups = await asyncio.gather(
+        db.calls.estimated_document_count(),
+        db.calls.count_documents({"timestamp": {"$gte": today_start}}),
+        db.calls.count_documents({"timestamp": {"$gte": week_start}}),
+        db.calls.aggregate(pipeline).to_list(None)
+    )
+    
+    calls_by_type = defaultdict(int)
+    calls_by_priority = defaultdict(int)
+    calls_by_status = defaultdict(int)
+    duration_total = 0
+    duration_count = 0
+    for doc in groups:
+        key = doc['_id']
+        calls_by_type[key.get('t')] += doc['count']
+        calls_by_priority[key.get('p')] += doc['count']
+        calls_by_status[key.get('s')] += doc['count']
+        duration_total += doc['duration_total']
+        duration_count += doc['duration_count']
+    avg_duration = duration_total / duration_count if duration_count else 0
     
     return CallStats(
         total_calls=total_calls,
         calls_today=calls_today,
         calls_this_week=calls_this_week,
-        calls_by_type=calls_by_type,
-        calls_by_priority=calls_by_priority,
-        calls_by_status=calls_by_status,
+        calls_by_type=dict(calls_by_type),
+        calls_by_priority=dict(calls_by_priority),
+        calls_by_status=dict(calls_by_status),
         avg_duration=avg_duration
     )
 
@@ -992,34 +1434,110 @@ async def get_call(
     call = await db.calls.find_one({"id": call_id}, {"_id": 0})
     if not call:
         raise HTTPException(status_code=404, detail="Call not found")
-    return call
+    return ORJSONResponse(call)
 
 @api_router.put("/calls/{call_id}", response_model=CallResponse)
 async def update_call(
     call_id: str,
     call_data: CallUpdate,
+    prefer: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_user)
 ):
-    call = await db.calls.find_one({"id": call_id})
-    if not call:
-        raise HTTPException(status_code=404, detail="Call not found")
+    """
+    Update a call.
     
+    With `Prefer: return=minimal` only the changed fields and the id are
+    returned, saving the read of the updated document.
+    """
     update_data = {k: v for k, v in call_data.model_dump().items() if v is not None}
     
-    await db.calls.update_one({"id": call_id}, {"$set": update_data})
+    if prefer and "return=minimal" in parse_prefer_header(prefer):
+        if update_data:
+            result = await db.calls.update_one({"id": call_id}, {"$set": update_data})
+            found = result.matched_count > 0
+        else:
+            found = await db.calls.count_documents({"id": call_id}, limit=1) > 0
+        
+        if not found:
+            raise HTTPException(status_code=404, detail="Call not found")
+        
+        call_stats_cache.clear()
+        return ORJSONResponse(
+            {**update_data, "id": call_id},
+            headers={"Preference-Applied": "return=minimal"}
+        )
+    
+    if update_data:
+        updated = await db.calls.find_one_and_update(
+            {"id": call_id},
+            {"$set": update_data},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+    else:
+        updated = await db.calls.find_one({"id": call_id}, {"_id": 0})
     
-    updated = await db.calls.find_one({"id": call_id}, {"_id": 0})
-    return updated
-
-@api_router.get("/calls/export/csv")
-async def export_calls_csv(
-    call_type: Optional[str] = None,
-    priority: Optional[str] = None,
-    status: Optional[str] = None,
-    date_from: Optional[str] = None,
-    date_to: Optional[str] = None,
-    current_user: dict = Depends(get_current_user)
-):
+    if not updated:
+        raise HTTPException(status_code=404, detail="Call not found")
+    
+    call_stats_cache.clear()
+    return ORJSONResponse(updated)
+
+class Echo:
+    """Pseudo-file for csv.writer: write() returns the formatted row instead of buffering it"""
+    def write(self, value):
+        return value
+
+# Rows fetched per getMore while streaming an export
+EXPORT_BATCH_SIZE = 1000
+
+# The synchronous export refuses queries matching more rows than this; larger
+# exports go through the background POST endpoint
+EXPORT_SYNC_MAX_ROWS = 5000
+
+# Background exports are written here as gzipped CSV files and deleted, along
+# with their status documents, after EXPORT_RETENTION
+EXPORT_DIR = Path(os.environ.get('EXPORT_DIR', ROOT_DIR / 'exports'))
+EXPORT_RETENTION = timedelta(hours=24)
+EXPORT_CLEANUP_INTERVAL = 3600  # seconds
+export_tasks = set()
+
+# Background exports run inside the API worker, so cap how many each worker
+# runs at once and how many each user may have in progress
+EXPORT_MAX_CONCURRENT = 2
+EXPORT_MAX_PER_USER = 1
+export_slots = asyncio.Semaphore(EXPORT_MAX_CONCURRENT)
+
+# Running exports refresh heartbeat_at this often. A pending or running export
+# whose heartbeat is older than EXPORT_STALE_AFTER lost its worker (crash,
+# restart or deploy) and is reported as failed.
+EXPORT_HEARTBEAT_INTERVAL = 30  # seconds
+EXPORT_STALE_AFTER = timedelta(minutes=2)
+
+# Header row of the CSV export, serialized once
+CSV_HEADER = b"ID,Caller Number,Contact Name,Agent,Duration (s),Call Type,Priority,Status,Notes,Resolution Notes,Timestamp\r\n"
+
+# Index key patterns (created at startup) used to back the list and export sorts
+EXPORT_TIMESTAMP_INDEX = [("timestamp", DESCENDING), ("id", DESCENDING)]
+EXPORT_FILTERED_INDEX = [
+    ("call_type", ASCENDING), ("priority", ASCENDING),
+    ("status", ASCENDING), ("timestamp", DESCENDING)
+]
+
+# Only the fields written to the CSV export
+EXPORT_PROJECTION = {
+    "_id": 0, "id": 1, "caller_number": 1, "contact_name": 1, "agent_name": 1,
+    "duration": 1, "call_type": 1, "priority": 1, "status": 1, "notes": 1,
+    "resolution_notes": 1, "timestamp": 1
+}
+
+def build_export_query(
+    call_type: Optional[str],
+    priority: Optional[str],
+    status: Optional[str],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime]
+) -> dict:
     query = {}
     
     if call_type:
@@ -1035,21 +1553,34 @@ async def export_calls_csv(
         query["timestamp"] = query.get("timestamp", {})
         query["timestamp"]["$lte"] = date_to
     
-    calls = await db.calls.find(query, {"_id": 0}).sort("timestamp", -1).to_list(10000)
-    
-    # Create CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
+    return query
+
+async def generate_csv_rows(query: dict):
+    """Yield the export CSV as encoded lines, streaming calls from the cursor"""
+    # Force an index that already yields calls in timestamp order so the sort
+    # never happens in memory. The compound index only does that when all
+    # three of its equality fields are filtered on.
+    if all(field in query for field in ("call_type", "priority", "status")):
+        hint = EXPORT_FILTERED_INDEX
+    else:
+        hint = EXPORT_TIMESTAMP_INDEX
+    cursor = (
+        db.calls.find(query, EXPORT_PROJECTION)
+        .sort("timestamp", -1)
+        .hint(hint)
+        .batch_size(EXPORT_BATCH_SIZE)
+    )
     
-    # Header
-    writer.writerow([
-        'ID', 'Caller Number', 'Contact Name', 'Agent', 'Duration (s)',
-        'Call Type', 'Priority', 'Status', 'Notes', 'Resolution Notes', 'Timestamp'
-    ])
+    yield CSV_HEADER
     
-    # Data
-    for call in calls:
-        writer.writerow([
+    # Data, written as it arrives from the cursor
+    writer = csv.writer(Echo())
+    async for call in cursor:
+        # Timestamps the date migration couldn't parse are still strings
+        timestamp = call['timestamp']
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.isoformat()
+        row = writer.writerow([
             call['id'],
             call['caller_number'],
             call.get('contact_name', ''),
@@ -1060,15 +1591,221 @@ async def export_calls_csv(
             call['status'],
             call.get('notes', ''),
             call.get('resolution_notes', ''),
-            call['timestamp']
+            timestamp
         ])
+        yield row.encode('utf-8')
+
+@api_router.get("/calls/export/csv")
+async def export_calls_csv(
+    call_type: Optional[str] = None,
+    priority: Optional[str] = None,
+    status: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    accept_encoding: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user)
+):
+    query = build_export_query(call_type, priority, status, date_from, date_to)
+    
+    # Large exports would tie up this worker and a cursor for too long
+    if await db.calls.count_documents(query, limit=EXPORT_SYNC_MAX_ROWS + 1) > EXPORT_SYNC_MAX_ROWS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Export exceeds {EXPORT_SYNC_MAX_ROWS} rows. Start a background export with POST /api/calls/export/csv"
+        )
     
-    output.seek(0)
+    headers = {
+        "Content-Disposition": f"attachment; filename=calls_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+        "Vary": "Accept-Encoding"
+    }
+    body = generate_csv_rows(query)
+    
+    # Compress while streaming; clients that accept gzip decode it transparently
+    if accept_encoding and "gzip" in accept_encoding:
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    
+    return StreamingResponse(body, media_type="text/csv", headers=headers)
+
+async def run_export_job(export_id: str, query: dict):
+    """Write a gzipped CSV export to EXPORT_DIR and record the outcome"""
+    path = EXPORT_DIR / f"{export_id}.csv.gz"
+    loop = asyncio.get_running_loop()
+    await db.exports.update_one({"id": export_id}, {"$set": {
+        "status": "running",
+        "heartbeat_at": datetime.now(timezone.utc)
+    }})
     
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=calls_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"}
+    try:
+        row_count = 0
+        next_heartbeat = loop.time() + EXPORT_HEARTBEAT_INTERVAL
+        
+        async def count_rows(rows):
+            nonlocal row_count
+            async for row in rows:
+                row_count += 1
+                yield row
+        
+        EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            async for chunk in gzip_stream(count_rows(generate_csv_rows(query))):
+                f.write(chunk)
+                if loop.time() >= next_heartbeat:
+                    next_heartbeat = loop.time() + EXPORT_HEARTBEAT_INTERVAL
+                    await db.exports.update_one(
+                        {"id": export_id}, {"$set": {"heartbeat_at": datetime.now(timezone.utc)}}
+                    )
+        
+        await db.exports.update_one({"id": export_id}, {"$set": {
+            "status": "completed",
+            "row_count": row_count - 1,  # excluding the header
+            "completed_at": datetime.now(timezone.utc)
+        }})
+        logger.info(f"Export {export_id} completed with {row_count - 1} rows")
+    except asyncio.CancelledError:
+        logger.warning(f"Export {export_id} interrupted by shutdown")
+        path.unlink(missing_ok=True)
+        await db.exports.update_one({"id": export_id}, {"$set": {
+            "status": "failed",
+            "error": "Export was interrupted by a server shutdown",
+            "completed_at": datetime.now(timezone.utc)
+        }})
+        raise
+    except Exception as e:
+        logger.exception(f"Export {export_id} failed")
+        path.unlink(missing_ok=True)
+        await db.exports.update_one({"id": export_id}, {"$set": {
+            "status": "failed",
+            "error": str(e),
+            "completed_at": datetime.now(timezone.utc)
+        }})
+
+def stale_export_filter() -> dict:
+    """Query for pending or running exports whose worker stopped heartbeating"""
+    return {
+        "status": {"$in": ["pending", "running"]},
+        # $not also matches exports created before heartbeats were recorded
+        "heartbeat_at": {"$not": {"$gte": datetime.now(timezone.utc) - EXPORT_STALE_AFTER}}
+    }
+
+STALE_EXPORT_UPDATE = {"$set": {
+    "status": "failed",
+    "error": "Export was interrupted before it completed"
+}}
+
+@api_router.post("/calls/export/csv", status_code=202)
+async def start_calls_export(
+    call_type: Optional[str] = None,
+    priority: Optional[str] = None,
+    status: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Start a background CSV export for large datasets.
+    
+    Poll the returned status_url until the export is completed, then fetch the
+    gzipped CSV from its download_url.
+    """
+    # Take a slot up front (acquire doesn't block when one is free) so
+    # concurrent requests can't all pass the check
+    if export_slots.locked():
+        raise HTTPException(
+            status_code=429,
+            detail="Too many exports are running, try again later",
+            headers={"Retry-After": "30"}
+        )
+    await export_slots.acquire()
+    
+    try:
+        in_progress = await db.exports.count_documents({
+            "created_by": current_user['id'],
+            "status": {"$in": ["pending", "running"]},
+            "heartbeat_at": {"$gte": datetime.now(timezone.utc) - EXPORT_STALE_AFTER}
+        })
+        if in_progress >= EXPORT_MAX_PER_USER:
+            raise HTTPException(status_code=409, detail="You already have an export in progress")
+        
+        export_id = generate_id()
+        query = build_export_query(call_type, priority, status, date_from, date_to)
+        now = datetime.now(timezone.utc)
+        
+        await db.exports.insert_one({
+            "id": export_id,
+            "status": "pending",
+            "created_by": current_user['id'],
+            "created_at": now,
+            "heartbeat_at": now,
+            "row_count": None,
+            "completed_at": None,
+            "error": None
+        })
+    except BaseException:
+        export_slots.release()
+        raise
+    
+    # Keep a reference so the task isn't garbage collected while running; the
+    # slot is released when it finishes
+    task = asyncio.create_task(run_export_job(export_id, query))
+    export_tasks.add(task)
+    task.add_done_callback(export_tasks.discard)
+    task.add_done_callback(lambda _: export_slots.release())
+    
+    return {
+        "export_id": export_id,
+        "status": "pending",
+        "status_url": f"/api/calls/export/{export_id}"
+    }
+
+async def get_export_for_user(export_id: str, current_user: dict) -> dict:
+    export = await db.exports.find_one({"id": export_id}, {"_id": 0})
+    if not export or (export['created_by'] != current_user['id'] and current_user['role'] != 'admin'):
+        raise HTTPException(status_code=404, detail="Export not found")
+    return export
+
+@api_router.get("/calls/export/{export_id}")
+async def get_calls_export(
+    export_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get the status of a background export"""
+    export = await get_export_for_user(export_id, current_user)
+    if export['status'] in ("pending", "running"):
+        # The worker running it may have died; report that instead of
+        # leaving clients to poll forever
+        stale = await db.exports.find_one_and_update(
+            {"id": export_id, **stale_export_filter()},
+            STALE_EXPORT_UPDATE,
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+        export = stale or export
+    if export['status'] == "completed":
+        export['download_url'] = f"/api/calls/export/{export_id}/download"
+    return ORJSONResponse(export)
+
+@api_router.get("/calls/export/{export_id}/download")
+async def download_calls_export(
+    export_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Download a completed background export as a gzipped CSV"""
+    export = await get_export_for_user(export_id, current_user)
+    if export['status'] != "completed":
+        raise HTTPException(status_code=409, detail="Export is not ready")
+    
+    # Files are local to the instance that wrote them and removed after
+    # EXPORT_RETENTION, so a completed export can outlive its file
+    path = EXPORT_DIR / f"{export_id}.csv.gz"
+    if not path.exists():
+        raise HTTPException(status_code=410, detail="Export file is no longer available")
+    
+    created = export['created_at'].strftime('%Y%m%d_%H%M%S')
+    return FileResponse(
+        path,
+        media_type="application/gzip",
+        filename=f"calls_export_{created}.csv.gz"
     )
 
 # Health check
@@ -1083,10 +1820,225 @@ app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_headers=["Authorization", "Content-Type", "Prefer"],
+    max_age=86400,  # let browsers cache preflight responses for a day
 )
 
+@app.on_event("startup")
+async def warm_up_db_client():
+    """Open the connection pool up front so the first request doesn't pay for it"""
+    await db.command("ping")
+
+# Date fields that were stored as ISO strings before switching to BSON dates
+DATE_FIELDS = {
+    "users": ["created_at", "last_login"],
+    "contacts": ["created_at", "updated_at"],
+    "calls": ["timestamp"],
+    "call_events": ["timestamp", "created_at", "processed_at"],
+}
+
+# An unfinished migration claimed longer ago than this is assumed abandoned
+MIGRATION_STALE_AFTER = timedelta(minutes=10)
+
+@app.on_event("startup")
+async def migrate_string_dates():
+    """
+    Convert legacy ISO string timestamps to BSON dates, once per database.
+    
+    A flag document in `migrations` records the run. The worker that claims it
+    does the conversion; other workers and later startups skip it once it is
+    completed, or while another claim is recent. A claim older than
+    MIGRATION_STALE_AFTER that never completed (worker killed mid-run) is taken
+    over. Only string values are converted, so rerunning is safe.
+    """
+    now = datetime.now(timezone.utc)
+    try:
+        # Upserts the flag if missing; an existing completed or fresh flag
+        # doesn't match, so the upsert collides on _id instead
+        await db.migrations.update_one(
+            {
+                "_id": "string_dates",
+                "completed_at": None,
+                "started_at": {"$lt": now - MIGRATION_STALE_AFTER}
+            },
+            {"$set": {"started_at": now}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return
+    
+    try:
+        unconverted = {}
+        for collection, fields in DATE_FIELDS.items():
+            for field in fields:
+                query = {field: {"$type": "string"}}
+                result = await db[collection].update_many(
+                    query,
+                    [{"$set": {field: {
+                        "$convert": {"input": f"${field}", "to": "date", "onError": f"${field}"}
+                    }}}]
+                )
+                if result.modified_count:
+                    logger.info(f"Converted {result.modified_count} {collection}.{field} values to dates")
+                
+                # Values $convert couldn't parse are left as strings
+                remaining = await db[collection].count_documents(query)
+                if remaining:
+                    unconverted[f"{collection}.{field}"] = remaining
+                    logger.warning(f"{remaining} {collection}.{field} values could not be parsed as dates and remain strings")
+    except Exception:
+        # Let the next startup retry the migration
+        await db.migrations.delete_one({"_id": "string_dates"})
+        raise
+    
+    await db.migrations.update_one({"_id": "string_dates"}, {"$set": {
+        "completed_at": datetime.now(timezone.utc),
+        "unconverted": unconverted
+    }})
+
+# Indexes earlier versions created on calls that only add write cost: the
+# single-field timestamp index is covered by (timestamp, id), call_type by the
+# prefix of the compound export index, and priority and status have a handful
+# of values each, too few to narrow a query much
+OBSOLETE_CALL_INDEXES = ["timestamp_-1", "call_type_1", "priority_1", "status_1"]
+
+async def create_unique_index(collection, field: str):
+    """
+    Create a unique index on `field`. When existing documents already violate
+    it, log the duplicate values and fall back to a plain index instead of
+    failing startup, so lookups and $text/$or searches on the field still work.
+    """
+    try:
+        await collection.create_index(field, unique=True)
+        return
+    except DuplicateKeyError:
+        pass
+    except OperationFailure as e:
+        if e.code not in (85, 86):  # IndexOptionsConflict, IndexKeySpecsConflict
+            raise
+        # The plain index from an earlier fallback is in the way: replace it,
+        # in case the duplicates have been cleaned up since
+        await collection.drop_index([(field, ASCENDING)])
+        return await create_unique_index(collection, field)
+
+    duplicates = await collection.aggregate([
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$limit": 10}
+    ]).to_list(None)
+    logger.error(
+        f"Cannot create unique index on {collection.name}.{field}: duplicate values "
+        f"{[(d['_id'], d['count']) for d in duplicates]} (first 10 shown). "
+        f"Merge or remove the duplicates and restart to enforce uniqueness."
+    )
+    await collection.create_index(field)
+
+@app.on_event("startup")
+async def create_db_indexes():
+    """Ensure indexes exist for the fields used in lookups, filters and sorts"""
+    # Users
+    await create_unique_index(db.users, "email")
+    await db.users.create_index("id", unique=True)
+    await db.users.create_index("role")
+    await db.users.create_index("extension", sparse=True)
+    await db.users.create_index([("name", "text"), ("email", "text")])
+
+    # Contacts
+    await create_unique_index(db.contacts, "phone_number")
+    await db.contacts.create_index("id", unique=True)
+    await db.contacts.create_index("tags")
+    await db.contacts.create_index("email")
+    await db.contacts.create_index([("created_at", -1), ("id", -1)])
+    await db.contacts.create_index([
+        ("name", "text"), ("email", "text"), ("phone_number", "text"), ("company", "text")
+    ])
+
+    # Calls (a call_type filter uses the prefix of the export's compound index)
+    await db.calls.create_indexes([
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel(EXPORT_TIMESTAMP_INDEX),
+        IndexModel([("contact_id", ASCENDING)]),
+        IndexModel([("agent_id", ASCENDING)]),
+        IndexModel([("caller_number", ASCENDING)]),
+        IndexModel(EXPORT_FILTERED_INDEX),
+        IndexModel([("caller_number", "text"), ("contact_name", "text"), ("notes", "text")])
+    ])
+    for name in OBSOLETE_CALL_INDEXES:
+        try:
+            await db.calls.drop_index(name)
+            logger.info(f"Dropped obsolete calls index {name}")
+        except OperationFailure:
+            pass  # already gone
+
+    # Call events
+    await db.call_events.create_index("id", unique=True)
+    await db.call_events.create_index("freepbx_call_id")
+    await db.call_events.create_index([("created_at", -1), ("id", -1)])
+    await db.call_events.create_index([("agent_id", 1), ("processed", 1)])
+
+    # Exports; status documents expire along with their files
+    await db.exports.create_index("id", unique=True)
+    await db.exports.create_index(
+        "created_at", expireAfterSeconds=int(EXPORT_RETENTION.total_seconds())
+    )
+
+@app.on_event("startup")
+async def fail_stale_exports():
+    """Mark exports left pending or running by a previous process as failed"""
+    result = await db.exports.update_many(stale_export_filter(), STALE_EXPORT_UPDATE)
+    if result.modified_count:
+        logger.info(f"Marked {result.modified_count} interrupted exports as failed")
+
+async def clean_up_export_files():
+    """Periodically delete export files older than EXPORT_RETENTION"""
+    while True:
+        cutoff = time.time() - EXPORT_RETENTION.total_seconds()
+        for path in EXPORT_DIR.glob("*.csv.gz"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except FileNotFoundError:
+                pass  # removed by another worker
+        await asyncio.sleep(EXPORT_CLEANUP_INTERVAL)
+
+@app.on_event("startup")
+async def start_export_cleanup():
+    app.state.export_cleanup = asyncio.create_task(clean_up_export_files())
+
+@app.on_event("startup")
+async def start_call_event_writer():
+    app.state.call_event_writer = asyncio.create_task(write_call_events())
+
+@app.on_event("shutdown")
+async def stop_exports():
+    """Cancel running exports so they record their failure before the client closes"""
+    app.state.export_cleanup.cancel()
+    for task in export_tasks:
+        task.cancel()
+    await asyncio.gather(app.state.export_cleanup, *export_tasks, return_exceptions=True)
+
+@app.on_event("shutdown")
+async def stop_call_event_writer():
+    """Flush queued call events before the MongoDB client is closed"""
+    await call_event_queue.put(None)
+    await app.state.call_event_writer
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    logger.info(f"Closing MongoDB client: {client.topology_description}")
     client.close()
+
+if __name__ == "__main__":
+    # Production: uvicorn server:app --workers $WEB_CONCURRENCY --loop uvloop --http httptools --no-access-log --log-level warning
+    import uvicorn
+    uvicorn.run(
+        "server:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=WEB_CONCURRENCY,
+        access_log=False,
+        log_level="warning"
+    )
@@ -43,6 +43,7 @@ export const authAPI = {
 // Contacts API
 export const contactsAPI = {
     getAll: (params) => api.get('/contacts', { params }),
+    getCount: () => api.get('/contacts/count'),
     getById: (id) => api.get(`/contacts/${id}`),
     getByPhone: (phone) => api.get(`/contacts/by-phone/${encodeURIComponent(phone)}`),
     create: (data) => api.post('/contacts', data),
@@ -67,8 +68,19 @@ export const callsAPI = {
             headers: {
                 Authorization: `Bearer ${token}`,
             },
-        }).then((res) => res.blob());
+        }).then((res) => {
+            if (!res.ok) {
+                const error = new Error(`Export failed with status ${res.status}`);
+                error.status = res.status;
+                throw error;
+            }
+            return res.blob();
+        });
     },
+    // Background export for result sets too large for exportCSV
+    startExport: (params) => api.post('/calls/export/csv', null, { params }),
+    getExport: (id) => api.get(`/calls/export/${id}`),
+    downloadExport: (id) => api.get(`/calls/export/${id}/download`, { responseType: 'blob' }),
 };
 
 // Admin API
@@ -70,6 +70,8 @@ export default function AdminPage() {
     const [users, setUsers] = useState([]);
     const [stats, setStats] = useState(null);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
+    const [nextCursor, setNextCursor] = useState(null);
     const [search, setSearch] = useState('');
     const [roleFilter, setRoleFilter] = useState('');
     const [statusFilter, setStatusFilter] = useState('');
@@ -91,18 +93,24 @@ export default function AdminPage() {
     });
     const [newPassword, setNewPassword] = useState('');
 
-    const fetchUsers = async () => {
+    // Fetches the first page, or appends the page after `cursor` when given
+    const fetchUsers = async (cursor = null) => {
+        if (cursor) setLoadingMore(true);
         try {
-            const params = {};
+            const params = { ...cursor };
             if (search) params.search = search;
             if (roleFilter) params.role = roleFilter;
             if (statusFilter) params.status = statusFilter;
             
             const response = await adminAPI.getUsers(params);
-            setUsers(response.data);
+            const { items, next } = response.data;
+            setUsers(prev => (cursor ? [...prev, ...items] : items));
+            setNextCursor(next);
         } catch (error) {
             console.error('Failed to fetch users:', error);
             toast.error('Failed to load users');
+        } finally {
+            if (cursor) setLoadingMore(false);
         }
     };
 
@@ -442,7 +450,7 @@ export default function AdminPage() {
                         User Management
                     </CardTitle>
                     <CardDescription>
-                        {users.length} user{users.length !== 1 ? 's' : ''} found
+                        {users.length}{nextCursor ? '+' : ''} user{users.length !== 1 ? 's' : ''} found
                     </CardDescription>
                 </CardHeader>
                 <CardContent className="p-0">
@@ -562,6 +570,19 @@ export default function AdminPage() {
                             </Table>
                         </div>
                     )}
+                    {nextCursor && (
+                        <div className="flex justify-center p-4 border-t border-border">
+                            <Button
+                                variant="outline"
+                                onClick={() => fetchUsers(nextCursor)}
+                                disabled={loadingMore}
+                                data-testid="load-more-users"
+                            >
+                                {loadingMore && <Loader2 className="w-4 h-4 mr-2 animate-spin" />}
+                                Load more
+                            </Button>
+                        </div>
+                    )}
                 </CardContent>
             </Card>
 
@@ -37,6 +37,8 @@ import { toast } from 'sonner';
 export default function CallsListPage() {
     const [calls, setCalls] = useState([]);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
+    const [nextCursor, setNextCursor] = useState(null);
     const [exporting, setExporting] = useState(false);
     
     // Filters
@@ -46,22 +48,26 @@ export default function CallsListPage() {
     const [statusFilter, setStatusFilter] = useState('');
     const [showFilters, setShowFilters] = useState(false);
 
-    const fetchCalls = async () => {
-        setLoading(true);
+    // Fetches the first page, or appends the page after `cursor` when given
+    const fetchCalls = async (cursor = null) => {
+        const setBusy = cursor ? setLoadingMore : setLoading;
+        setBusy(true);
         try {
-            const params = {};
+            const params = { ...cursor };
             if (search) params.search = search;
             if (typeFilter) params.call_type = typeFilter;
             if (priorityFilter) params.priority = priorityFilter;
             if (statusFilter) params.status = statusFilter;
             
             const response = await callsAPI.getAll(params);
-            setCalls(response.data);
+            const { items, next } = response.data;
+            setCalls(prev => (cursor ? [...prev, ...items] : items));
+            setNextCursor(next);
         } catch (error) {
             console.error('Failed to fetch calls:', error);
             toast.error('Failed to load calls');
         } finally {
-            setLoading(false);
+            setBusy(false);
         }
     };
 
@@ -76,6 +82,21 @@ export default function CallsListPage() {
         return () => clearTimeout(debounce);
     }, [search]);
 
+    // Starts a background export and polls it until the gzipped CSV is ready
+    const runBackgroundExport = async (params) => {
+        toast.info('Large export started, the download will begin when it is ready');
+        const { data } = await callsAPI.startExport(params);
+        let exportJob = data;
+        while (exportJob.status === 'pending' || exportJob.status === 'running') {
+            await new Promise((resolve) => setTimeout(resolve, 2000));
+            exportJob = (await callsAPI.getExport(data.export_id)).data;
+        }
+        if (exportJob.status !== 'completed') {
+            throw new Error(exportJob.error || 'Export failed');
+        }
+        return (await callsAPI.downloadExport(data.export_id)).data;
+    };
+
     const handleExport = async () => {
         setExporting(true);
         try {
@@ -84,11 +105,20 @@ export default function CallsListPage() {
             if (priorityFilter) params.priority = priorityFilter;
             if (statusFilter) params.status = statusFilter;
             
-            const blob = await callsAPI.exportCSV(params);
+            let filename = `calls_export_${new Date().toISOString().split('T')[0]}.csv`;
+            let blob;
+            try {
+                blob = await callsAPI.exportCSV(params);
+            } catch (error) {
+                // Too many rows for a direct download
+                if (error.status !== 400) throw error;
+                blob = await runBackgroundExport(params);
+                filename += '.gz';
+            }
             const url = window.URL.createObjectURL(blob);
             const a = document.createElement('a');
             a.href = url;
-            a.download = `calls_export_${new Date().toISOString().split('T')[0]}.csv`;
+            a.download = filename;
             document.body.appendChild(a);
             a.click();
             window.URL.revokeObjectURL(url);
@@ -96,7 +126,7 @@ export default function CallsListPage() {
             toast.success('Export downloaded successfully');
         } catch (error) {
             console.error('Export failed:', error);
-            toast.error('Failed to export calls');
+            toast.error(error.response?.data?.detail || 'Failed to export calls');
         } finally {
             setExporting(false);
         }
@@ -347,6 +377,19 @@ export default function CallsListPage() {
                             </Table>
                         </div>
                     )}
+                    {!loading && nextCursor && (
+                        <div className="flex justify-center p-4 border-t border-border">
+                            <Button
+                                variant="outline"
+                                onClick={() => fetchCalls(nextCursor)}
+                                disabled={loadingMore}
+                                data-testid="load-more-calls"
+                            >
+                                {loadingMore && <Loader2 className="w-4 h-4 mr-2 animate-spin" />}
+                                Load more
+                            </Button>
+                        </div>
+                    )}
                 </CardContent>
             </Card>
         </div>
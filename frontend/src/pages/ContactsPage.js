@@ -54,6 +54,8 @@ export default function ContactsPage() {
     
     const [contacts, setContacts] = useState([]);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
+    const [nextCursor, setNextCursor] = useState(null);
     const [search, setSearch] = useState('');
     
     // FreePBX redirect params
@@ -90,19 +92,23 @@ export default function ContactsPage() {
         }
     }, [phoneParam]);
 
-    const fetchContacts = async () => {
-        setLoading(true);
+    // Fetches the first page, or appends the page after `cursor` when given
+    const fetchContacts = async (cursor = null) => {
+        const setBusy = cursor ? setLoadingMore : setLoading;
+        setBusy(true);
         try {
-            const params = {};
+            const params = { ...cursor };
             if (search) params.search = search;
             
             const response = await contactsAPI.getAll(params);
-            setContacts(response.data);
+            const { items, next } = response.data;
+            setContacts(prev => (cursor ? [...prev, ...items] : items));
+            setNextCursor(next);
         } catch (error) {
             console.error('Failed to fetch contacts:', error);
             toast.error('Failed to load contacts');
         } finally {
-            setLoading(false);
+            setBusy(false);
         }
     };
 
@@ -386,6 +392,19 @@ export default function ContactsPage() {
                             </Table>
                         </div>
                     )}
+                    {!loading && nextCursor && (
+                        <div className="flex justify-center p-4 border-t border-border">
+                            <Button
+                                variant="outline"
+                                onClick={() => fetchContacts(nextCursor)}
+                                disabled={loadingMore}
+                                data-testid="load-more-contacts"
+                            >
+                                {loadingMore && <Loader2 className="w-4 h-4 mr-2 animate-spin" />}
+                                Load more
+                            </Button>
+                        </div>
+                    )}
                 </CardContent>
             </Card>
 
@@ -55,13 +55,13 @@ export default function DashboardPage() {
             try {
                 const [statsRes, callsRes, contactsRes] = await Promise.all([
                     callsAPI.getStats(),
-                    callsAPI.getAll({}),
-                    contactsAPI.getAll({})
+                    callsAPI.getAll({ limit: 5 }),
+                    contactsAPI.getCount()
                 ]);
                 
                 setStats(statsRes.data);
-                setRecentCalls(callsRes.data.slice(0, 5));
-                setContactCount(contactsRes.data.length);
+                setRecentCalls(callsRes.data.items.slice(0, 5));
+                setContactCount(contactsRes.data.count);
             } catch (error) {
                 console.error('Failed to fetch dashboard data:', error);
             } finally {